@@ -6,13 +6,17 @@ Fetches YTD 2026 data and computes technical indicators for given stocks.
 Usage:
     python analyze.py AAPL MSFT GOOG ...
     python analyze.py --group 1          # Analyze group_1 from nasdaq100_symbols.json
+    python analyze.py --group 1 --no-cache   # Bypass the local yfinance cache
 """
 from __future__ import annotations
 
 import sys
+import hashlib
 import json
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -20,6 +24,7 @@ from typing import Optional
 import yfinance as yf
 import pandas as pd
 import numpy as np
+import orjson
 
 # Project paths
 SCRIPT_DIR = Path(__file__).parent
@@ -27,38 +32,68 @@ PROJECT_DIR = SCRIPT_DIR.parent
 DATA_DIR = PROJECT_DIR / "data" / "stocks"
 SYMBOLS_FILE = SCRIPT_DIR / "nasdaq100_symbols.json"
 
+# Indicator kernel source and the hash recorded by build_indicators.py
+KERNELS_SOURCE = SCRIPT_DIR / "indicators.py"
+AOT_HASH_FILE = SCRIPT_DIR / "indicators_aot.sha256"
 
-def compute_rsi(series: pd.Series, period: int = 14) -> pd.Series:
+# Local cache of downloaded yfinance data, so re-runs skip the network
+CACHE_DIR = PROJECT_DIR / ".yf_cache"
+CACHE_TTL = timedelta(hours=6)
+
+# Date range: extra history before the YTD start is needed for long MAs
+HISTORY_START = "2025-05-01"
+YTD_START = "2026-01-01"
+
+# Moving average windows and Bollinger Band settings
+MA_WINDOWS = np.array([5, 10, 20, 50, 200], dtype=np.int64)
+BB_PERIOD = 20
+BB_STD_DEV = 2
+
+
+def _load_kernels():
+    """Use the AOT-built kernels if they were built from the current
+    indicators.py, otherwise fall back to the JIT-compiled module."""
+    try:
+        import indicators_aot  # built by build_indicators.py
+    except ImportError:
+        import indicators
+        return indicators
+
+    source_hash = hashlib.sha256(KERNELS_SOURCE.read_bytes()).hexdigest()
+    built_hash = AOT_HASH_FILE.read_text().strip() if AOT_HASH_FILE.exists() else None
+    if built_hash != source_hash:
+        print("WARNING: indicators_aot is out of date with indicators.py; using JIT kernels. "
+              "Re-run build_indicators.py to rebuild it.")
+        import indicators
+        return indicators
+    return indicators_aot
+
+
+kernels = _load_kernels()
+
+
+def compute_rsi(values: np.ndarray, period: int = 14) -> np.ndarray:
     """Compute Relative Strength Index."""
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.ewm(alpha=1/period, min_periods=period).mean()
-    avg_loss = loss.ewm(alpha=1/period, min_periods=period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    delta = np.diff(values, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain, avg_loss = kernels.ewm_pair(gain, loss, 1 / period, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
     return rsi
 
 
-def compute_macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
+def compute_macd(values: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
     """Compute MACD, Signal line, and Histogram."""
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
+    ema_fast = kernels.ewm_alpha(values, 2 / (fast + 1))
+    ema_slow = kernels.ewm_alpha(values, 2 / (slow + 1))
     macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    signal_line = kernels.ewm_alpha(macd_line, 2 / (signal + 1))
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
 
-def compute_bollinger(series: pd.Series, period: int = 20, std_dev: int = 2):
-    """Compute Bollinger Bands."""
-    ma = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
-    upper = ma + std_dev * std
-    lower = ma - std_dev * std
-    return upper, ma, lower
-
-
 def safe_float(val):
     """Convert numpy/pandas values to Python float, handling NaN."""
     if val is None or (isinstance(val, float) and np.isnan(val)):
@@ -70,103 +105,196 @@ def safe_float(val):
         return None
 
 
-def series_to_list(series: pd.Series) -> list:
-    """Convert pandas Series to list of safe floats."""
-    return [safe_float(v) for v in series]
+def round_values(values) -> np.ndarray:
+    """Round a Series/array to 4 decimals as a float64 ndarray.
 
+    NaN/inf are left in place; orjson serializes them as null.
+    """
+    return np.round(np.asarray(values, dtype=np.float64), 4)
 
-def analyze_stock(symbol: str) -> Optional[dict]:
-    """Fetch and analyze a single stock. Returns analysis dict or None on failure."""
-    print(f"  Analyzing {symbol}...")
 
+def _cache_is_fresh(path: Path) -> bool:
+    """Whether a cache file exists and is younger than CACHE_TTL."""
+    if not path.exists():
+        return False
+    return datetime.now() - datetime.fromtimestamp(path.stat().st_mtime) < CACHE_TTL
+
+
+def _write_cache(path: Path, write) -> None:
+    """Write a cache file atomically via a temp file, so an interrupted run
+    never leaves a partial file behind. write(tmp_path) produces the content."""
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"    WARNING: Could not write cache file {path.name}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def _prune_history_cache() -> None:
+    """Delete history pickles older than CACHE_TTL; their keys include the
+    end date, so they would otherwise accumulate one per symbol per day."""
+    for path in CACHE_DIR.glob("*.pkl"):
+        if not _cache_is_fresh(path):
+            path.unlink(missing_ok=True)
+
+
+def fetch_history(
+    symbols: list[str], start: str, end: str, use_cache: bool = True
+) -> dict[str, pd.DataFrame]:
+    """Download price history for all symbols in a single batched request.
+
+    Symbols with a fresh entry in CACHE_DIR are loaded from disk instead.
+    """
+    hist_map = {}
+    if use_cache:
+        _prune_history_cache()
+        for symbol in symbols:
+            cache_file = CACHE_DIR / f"{symbol}_{start}_{end}.pkl"
+            if _cache_is_fresh(cache_file):
+                try:
+                    hist_map[symbol] = pd.read_pickle(cache_file)
+                except Exception as e:
+                    print(f"    WARNING: Ignoring unreadable cache file {cache_file.name}: {e}")
+
+    missing = [s for s in symbols if s not in hist_map]
+    if not missing:
+        return hist_map
+
+    data = yf.download(
+        tickers=" ".join(missing),
+        start=start,
+        end=end,
+        group_by="ticker",
+        threads=True,
+        auto_adjust=True,
+        progress=False,
+    )
+
+    for symbol in missing:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                hist_map[symbol] = pd.DataFrame()
+                continue
+            hist = data[symbol]
+        else:
+            hist = data
+        # Rows are aligned across tickers, so drop dates this symbol did not trade
+        hist = hist.dropna(subset=["Close"])
+        if use_cache and not hist.empty:
+            _write_cache(CACHE_DIR / f"{symbol}_{start}_{end}.pkl", hist.to_pickle)
+        hist_map[symbol] = hist
+    return hist_map
+
+
+def _fetch_info(symbol: str, use_cache: bool = True) -> dict:
+    """Fetch company info for one symbol, returning {} on failure."""
+    cache_file = CACHE_DIR / f"{symbol}_info.json"
+    if use_cache and _cache_is_fresh(cache_file):
+        try:
+            return orjson.loads(cache_file.read_bytes())
+        except Exception as e:
+            print(f"    WARNING: Ignoring unreadable cache file {cache_file.name}: {e}")
     try:
-        ticker = yf.Ticker(symbol)
+        info = yf.Ticker(symbol).info or {}
+    except Exception as e:
+        print(f"    WARNING: Could not fetch info for {symbol}: {e}")
+        return {}
+    if use_cache and info:
+        _write_cache(cache_file, lambda tmp_path: tmp_path.write_bytes(orjson.dumps(info)))
+    return info
 
-        # Fetch YTD 2026 data (from Jan 1 2026 to today)
-        # Also fetch extra history for MA200 computation
-        start_date = "2025-05-01"  # Extra history for long MAs
-        ytd_start = "2026-01-01"
-        end_date = datetime.now().strftime("%Y-%m-%d")
 
-        hist = ticker.history(start=start_date, end=end_date)
+def fetch_info(symbols: list[str], use_cache: bool = True) -> dict[str, dict]:
+    """Fetch company info for all symbols concurrently."""
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        return dict(zip(symbols, ex.map(partial(_fetch_info, use_cache=use_cache), symbols)))
+
+
+def analyze_stock(symbol: str, hist: pd.DataFrame, info: dict, end_date: str) -> Optional[dict]:
+    """Analyze a single stock's price history. Returns analysis dict or None on failure."""
+    print(f"  Analyzing {symbol}...")
+
+    try:
+        ytd_start = YTD_START
 
         if hist.empty or len(hist) < 5:
             print(f"    WARNING: No sufficient data for {symbol}, skipping.")
             return None
 
         # Get company info
-        info = ticker.info or {}
         company_name = info.get("longName") or info.get("shortName") or symbol
         sector = info.get("sector", "Unknown")
         market_cap = info.get("marketCap")
 
-        # Split into full history (for MAs) and YTD
-        ytd_data = hist[hist.index >= ytd_start].copy()
+        # Split into full history (for MAs) and YTD; YTD is a contiguous suffix
+        start_pos = hist.index.searchsorted(pd.Timestamp(ytd_start, tz=hist.index.tz))
+        ytd_data = hist.iloc[start_pos:]
         if ytd_data.empty:
             print(f"    WARNING: No YTD 2026 data for {symbol}, skipping.")
             return None
 
-        close = hist["Close"]
-        ytd_close = ytd_data["Close"]
+        close_values = hist["Close"].to_numpy(dtype=np.float64)
+        ytd_close = close_values[start_pos:]
 
         # --- Key Metrics ---
-        first_close = ytd_close.iloc[0]
-        last_close = ytd_close.iloc[-1]
+        first_close = ytd_close[0]
+        last_close = ytd_close[-1]
         ytd_return = (last_close - first_close) / first_close
 
         # Max drawdown (YTD)
-        cummax = ytd_close.cummax()
-        drawdown = (ytd_close - cummax) / cummax
-        max_drawdown = drawdown.min()
+        max_drawdown = kernels.max_drawdown(ytd_close)
 
         # Annualized volatility
-        daily_returns = ytd_close.pct_change().dropna()
-        volatility = daily_returns.std() * np.sqrt(252) if len(daily_returns) > 1 else 0
+        daily_returns = np.diff(ytd_close) / ytd_close[:-1]
+        volatility = daily_returns.std(ddof=1) * np.sqrt(252) if len(daily_returns) > 1 else 0
 
         # Volume
-        avg_volume = int(ytd_data["Volume"].mean()) if "Volume" in ytd_data else 0
+        avg_volume = 0
+        if "Volume" in ytd_data:
+            avg_volume = int(np.nanmean(ytd_data["Volume"].to_numpy(dtype=np.float64)))
 
         # 52-week high/low (use full history)
-        one_year_ago = datetime.now() - timedelta(days=365)
-        year_data = hist[hist.index >= one_year_ago.strftime("%Y-%m-%d")]
-        high_52w = float(year_data["High"].max()) if not year_data.empty else None
-        low_52w = float(year_data["Low"].min()) if not year_data.empty else None
+        one_year_cutoff = pd.Timestamp(end_date, tz=hist.index.tz) - pd.Timedelta(days=365)
+        pos_52w = hist.index.searchsorted(one_year_cutoff)
+        high_vals = hist["High"].to_numpy(dtype=np.float64)[pos_52w:]
+        low_vals = hist["Low"].to_numpy(dtype=np.float64)[pos_52w:]
+        high_52w = float(np.nanmax(high_vals)) if high_vals.size else None
+        low_52w = float(np.nanmin(low_vals)) if low_vals.size else None
 
         # Last trading day change
-        last_change = float(daily_returns.iloc[-1]) if len(daily_returns) > 0 else 0
+        last_change = float(daily_returns[-1]) if len(daily_returns) > 0 else 0
 
         # --- Technical Indicators (computed on full history, sliced to YTD) ---
-        ma5 = close.rolling(5).mean()
-        ma10 = close.rolling(10).mean()
-        ma20 = close.rolling(20).mean()
-        ma50 = close.rolling(50).mean()
-        ma200 = close.rolling(200).mean()
+        rolling = kernels.rolling_means_and_bb(close_values, MA_WINDOWS, BB_PERIOD)
+        ma5, ma10, ma20, ma50, ma200, bb_mid, bb_std = rolling.T
+        bb_upper = bb_mid + BB_STD_DEV * bb_std
+        bb_lower = bb_mid - BB_STD_DEV * bb_std
 
-        rsi = compute_rsi(close)
-        macd_line, signal_line, macd_hist = compute_macd(close)
-        bb_upper, bb_mid, bb_lower = compute_bollinger(close)
+        rsi = compute_rsi(close_values)
+        macd_line, signal_line, macd_hist = compute_macd(close_values)
 
         # Slice indicators to YTD range
-        ytd_idx = ytd_data.index
-        ma5_ytd = ma5.reindex(ytd_idx)
-        ma10_ytd = ma10.reindex(ytd_idx)
-        ma20_ytd = ma20.reindex(ytd_idx)
-        ma50_ytd = ma50.reindex(ytd_idx)
-        ma200_ytd = ma200.reindex(ytd_idx)
-        rsi_ytd = rsi.reindex(ytd_idx)
-        macd_ytd = macd_line.reindex(ytd_idx)
-        signal_ytd = signal_line.reindex(ytd_idx)
-        macd_hist_ytd = macd_hist.reindex(ytd_idx)
-        bb_upper_ytd = bb_upper.reindex(ytd_idx)
-        bb_mid_ytd = bb_mid.reindex(ytd_idx)
-        bb_lower_ytd = bb_lower.reindex(ytd_idx)
+        ma5_ytd = ma5[start_pos:]
+        ma10_ytd = ma10[start_pos:]
+        ma20_ytd = ma20[start_pos:]
+        ma50_ytd = ma50[start_pos:]
+        ma200_ytd = ma200[start_pos:]
+        rsi_ytd = rsi[start_pos:]
+        macd_ytd = macd_line[start_pos:]
+        signal_ytd = signal_line[start_pos:]
+        macd_hist_ytd = macd_hist[start_pos:]
+        bb_upper_ytd = bb_upper[start_pos:]
+        bb_mid_ytd = bb_mid[start_pos:]
+        bb_lower_ytd = bb_lower[start_pos:]
 
         # Current technical status
-        current_rsi = safe_float(rsi_ytd.iloc[-1])
-        current_macd = safe_float(macd_ytd.iloc[-1])
-        current_signal = safe_float(signal_ytd.iloc[-1])
-        above_ma50 = bool(last_close > ma50_ytd.iloc[-1]) if pd.notna(ma50_ytd.iloc[-1]) else None
-        above_ma200 = bool(last_close > ma200_ytd.iloc[-1]) if pd.notna(ma200_ytd.iloc[-1]) else None
+        current_rsi = safe_float(rsi_ytd[-1])
+        current_macd = safe_float(macd_ytd[-1])
+        current_signal = safe_float(signal_ytd[-1])
+        above_ma50 = bool(last_close > ma50_ytd[-1]) if np.isfinite(ma50_ytd[-1]) else None
+        above_ma200 = bool(last_close > ma200_ytd[-1]) if np.isfinite(ma200_ytd[-1]) else None
 
         macd_signal_str = "neutral"
         if current_macd is not None and current_signal is not None:
@@ -176,16 +304,17 @@ def analyze_stock(symbol: str) -> Optional[dict]:
                 macd_signal_str = "bearish"
 
         # --- Build price history array ---
-        price_history = []
-        for idx, row in ytd_data.iterrows():
-            price_history.append({
-                "date": idx.strftime("%Y-%m-%d"),
-                "open": safe_float(row["Open"]),
-                "high": safe_float(row["High"]),
-                "low": safe_float(row["Low"]),
-                "close": safe_float(row["Close"]),
-                "volume": int(row["Volume"]) if pd.notna(row.get("Volume", None)) else 0
-            })
+        dates = ytd_data.index.strftime("%Y-%m-%d").tolist()
+        opens, highs, lows, closes = (round_values(ytd_data[c]).tolist() for c in ("Open", "High", "Low", "Close"))
+        if "Volume" in ytd_data:
+            vol_values = ytd_data["Volume"].to_numpy(dtype=np.float64)
+            volumes = np.where(np.isfinite(vol_values), vol_values, 0).astype(np.int64).tolist()
+        else:
+            volumes = [0] * len(dates)
+        price_history = [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+        ]
 
         # --- Assemble result ---
         result = {
@@ -213,22 +342,22 @@ def analyze_stock(symbol: str) -> Optional[dict]:
             },
             "priceHistory": price_history,
             "indicators": {
-                "dates": [idx.strftime("%Y-%m-%d") for idx in ytd_idx],
-                "ma5": series_to_list(ma5_ytd),
-                "ma10": series_to_list(ma10_ytd),
-                "ma20": series_to_list(ma20_ytd),
-                "ma50": series_to_list(ma50_ytd),
-                "ma200": series_to_list(ma200_ytd),
-                "rsi": series_to_list(rsi_ytd),
+                "dates": dates,
+                "ma5": round_values(ma5_ytd),
+                "ma10": round_values(ma10_ytd),
+                "ma20": round_values(ma20_ytd),
+                "ma50": round_values(ma50_ytd),
+                "ma200": round_values(ma200_ytd),
+                "rsi": round_values(rsi_ytd),
                 "macd": {
-                    "macd": series_to_list(macd_ytd),
-                    "signal": series_to_list(signal_ytd),
-                    "histogram": series_to_list(macd_hist_ytd),
+                    "macd": round_values(macd_ytd),
+                    "signal": round_values(signal_ytd),
+                    "histogram": round_values(macd_hist_ytd),
                 },
                 "bollinger": {
-                    "upper": series_to_list(bb_upper_ytd),
-                    "middle": series_to_list(bb_mid_ytd),
-                    "lower": series_to_list(bb_lower_ytd),
+                    "upper": round_values(bb_upper_ytd),
+                    "middle": round_values(bb_mid_ytd),
+                    "lower": round_values(bb_lower_ytd),
                 },
             },
         }
@@ -245,6 +374,7 @@ def main():
     parser = argparse.ArgumentParser(description="Analyze Nasdaq 100 stocks")
     parser.add_argument("symbols", nargs="*", help="Stock symbols to analyze")
     parser.add_argument("--group", type=int, help="Group number (1-10) from nasdaq100_symbols.json")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the local yfinance cache")
     args = parser.parse_args()
 
     # Determine symbols to analyze
@@ -264,22 +394,42 @@ def main():
 
     print(f"Analyzing {len(symbols)} stocks: {', '.join(symbols)}")
     print(f"Output directory: {DATA_DIR}")
+    print(f"Indicator kernels: {kernels.__name__}")
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Fetch YTD 2026 data (from Jan 1 2026 to today) plus extra history for MA200
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    print("Downloading price history...")
+    use_cache = not args.no_cache
+    if use_cache:
+        CACHE_DIR.mkdir(exist_ok=True)
+    hist_map = fetch_history(symbols, HISTORY_START, end_date, use_cache)
+    print("Fetching company info...")
+    info_map = fetch_info(symbols, use_cache)
+
     results = {}
     failed = []
 
-    for symbol in symbols:
-        result = analyze_stock(symbol)
-        if result:
-            # Save individual JSON file
-            output_file = DATA_DIR / f"{symbol}.json"
-            with open(output_file, "w") as f:
-                json.dump(result, f, indent=2)
-            results[symbol] = "OK"
-            print(f"    Saved: {output_file}")
-        else:
-            failed.append(symbol)
+    # Each symbol is independent, so fan the CPU-bound analysis out across cores;
+    # files are written here in the parent process.
+    with ProcessPoolExecutor(max_workers=min(len(symbols), os.cpu_count() or 1)) as ex:
+        futures = {
+            ex.submit(analyze_stock, symbol, hist_map[symbol], info_map[symbol], end_date): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            result = future.result()
+            if result:
+                # Save individual JSON file
+                output_file = DATA_DIR / f"{symbol}.json"
+                output_file.write_bytes(
+                    orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+                )
+                results[symbol] = "OK"
+                print(f"    Saved: {output_file}")
+            else:
+                failed.append(symbol)
 
     # Summary
     print(f"\n{'='*50}")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time compile the Numba indicator kernels in indicators.py into
+the indicators_aot extension module, so analyze.py starts without JIT warmup.
+
+Usage:
+    python build_indicators.py
+"""
+import hashlib
+from pathlib import Path
+
+from numba.pycc import CC
+
+import indicators
+
+SCRIPT_DIR = Path(__file__).parent
+KERNELS_SOURCE = SCRIPT_DIR / "indicators.py"
+# analyze.py compares this against indicators.py to detect a stale build
+AOT_HASH_FILE = SCRIPT_DIR / "indicators_aot.sha256"
+
+# Exported name -> explicit signature; AOT functions only accept these types
+SIGNATURES = {
+    "ewm_alpha": "f8[:](f8[:], f8)",
+    "ewm_pair": "f8[:, :](f8[:], f8[:], f8, i8)",
+    "rolling_means_and_bb": "f8[:, :](f8[:], i8[:], i8)",
+    "max_drawdown": "f8(f8[:])",
+}
+
+
+def main():
+    cc = CC("indicators_aot")
+    cc.output_dir = str(SCRIPT_DIR)
+    for name, signature in SIGNATURES.items():
+        cc.export(name, signature)(getattr(indicators, name).py_func)
+    cc.compile()
+    AOT_HASH_FILE.write_text(hashlib.sha256(KERNELS_SOURCE.read_bytes()).hexdigest() + "\n")
+    print(f"Built indicators_aot in {SCRIPT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
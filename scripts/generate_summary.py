@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Consolidate all NASDAQ-100 stock analyses into a single summary.json."""
 
-import json
+import heapq
 import os
 import statistics
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
 
 STOCKS_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'stocks')
 OUTPUT_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'summary.json')
@@ -14,17 +18,17 @@ REQUIRED_KEYS = {'symbol', 'name', 'sector', 'marketCap', 'metrics', 'technicals
 
 def load_stocks():
     """Load all stock JSON files and validate them."""
+    with os.scandir(STOCKS_DIR) as it:
+        entries = sorted((e for e in it if e.name.endswith('.json')), key=lambda e: e.name)
+    with ThreadPoolExecutor() as ex:
+        loaded = list(ex.map(lambda e: orjson.loads(Path(e.path).read_bytes()), entries))
+
     stocks = []
     errors = []
-    for filename in sorted(os.listdir(STOCKS_DIR)):
-        if not filename.endswith('.json'):
-            continue
-        filepath = os.path.join(STOCKS_DIR, filename)
-        with open(filepath) as f:
-            data = json.load(f)
+    for entry, data in zip(entries, loaded):
         missing = REQUIRED_KEYS - set(data.keys())
         if missing:
-            errors.append(f"{filename}: missing keys {missing}")
+            errors.append(f"{entry.name}: missing keys {missing}")
         else:
             stocks.append(data)
     return stocks, errors
@@ -49,10 +53,10 @@ def build_stock_summary(stock):
 
 def build_rankings(summaries):
     """Top 10 gainers and bottom 10 losers by YTD return."""
-    by_ytd = sorted(summaries, key=lambda s: s['ytdReturn'], reverse=True)
+    ranked = [s for s in summaries if s['ytdReturn'] is not None]
     return {
-        'topGainers': by_ytd[:10],
-        'topLosers': by_ytd[-10:][::-1],  # worst first
+        'topGainers': heapq.nlargest(10, ranked, key=lambda s: s['ytdReturn']),
+        'topLosers': heapq.nsmallest(10, ranked, key=lambda s: s['ytdReturn']),  # worst first
     }
 
 
@@ -64,11 +68,17 @@ def build_sector_stats(summaries):
 
     stats = {}
     for sector, members in sorted(sectors.items()):
-        returns = [m['ytdReturn'] for m in members]
-        best = max(members, key=lambda m: m['ytdReturn'])
-        worst = min(members, key=lambda m: m['ytdReturn'])
+        total = 0.0
+        best = worst = members[0]
+        for m in members:
+            r = m['ytdReturn']
+            total += r
+            if r > best['ytdReturn']:
+                best = m
+            if r < worst['ytdReturn']:
+                worst = m
         stats[sector] = {
-            'avgYtdReturn': round(sum(returns) / len(returns), 4),
+            'avgYtdReturn': round(total / len(members), 4),
             'count': len(members),
             'bestPerformer': {'symbol': best['symbol'], 'ytdReturn': best['ytdReturn']},
             'worstPerformer': {'symbol': worst['symbol'], 'ytdReturn': worst['ytdReturn']},
@@ -76,15 +86,38 @@ def build_sector_stats(summaries):
     return stats
 
 
-def build_market_overview(summaries, analysis_date):
-    """Compute market-wide aggregate stats."""
-    returns = [s['ytdReturn'] for s in summaries]
-    bullish = sum(1 for s in summaries if s['macdSignal'] == 'bullish')
-    bearish = sum(1 for s in summaries if s['macdSignal'] == 'bearish')
-    above_50 = sum(1 for s in summaries if s['aboveMa50'] is True)
-    above_200 = sum(1 for s in summaries if s['aboveMa200'] is True)
-    return {
-        'avgYtdReturn': round(statistics.mean(returns), 4),
+def build_overview_and_extremes(summaries, analysis_date):
+    """Compute market-wide aggregate stats and find overbought (RSI > 70) and
+    oversold (RSI < 30) stocks in a single pass over the summaries."""
+    returns = []
+    total = 0.0
+    bullish = bearish = above_50 = above_200 = 0
+    overbought = []
+    oversold = []
+    for s in summaries:
+        ytd = s['ytdReturn']
+        returns.append(ytd)
+        total += ytd
+        if s['macdSignal'] == 'bullish':
+            bullish += 1
+        elif s['macdSignal'] == 'bearish':
+            bearish += 1
+        if s['aboveMa50'] is True:
+            above_50 += 1
+        if s['aboveMa200'] is True:
+            above_200 += 1
+        rsi = s['rsi']
+        if rsi is None:
+            continue
+        if rsi > 70:
+            overbought.append({'symbol': s['symbol'], 'name': s['name'], 'rsi': rsi, 'ytdReturn': ytd})
+        elif rsi < 30:
+            oversold.append({'symbol': s['symbol'], 'name': s['name'], 'rsi': rsi, 'ytdReturn': ytd})
+
+    overbought.sort(key=lambda x: x['rsi'], reverse=True)
+    oversold.sort(key=lambda x: x['rsi'])
+    market_overview = {
+        'avgYtdReturn': round(total / len(returns), 4),
         'medianYtdReturn': round(statistics.median(returns), 4),
         'bullishCount': bullish,
         'bearishCount': bearish,
@@ -93,21 +126,7 @@ def build_market_overview(summaries, analysis_date):
         'totalStocks': len(summaries),
         'analysisDate': analysis_date,
     }
-
-
-def find_extremes(summaries):
-    """Find overbought (RSI > 70) and oversold (RSI < 30) stocks."""
-    overbought = [
-        {'symbol': s['symbol'], 'name': s['name'], 'rsi': s['rsi'], 'ytdReturn': s['ytdReturn']}
-        for s in summaries if s['rsi'] is not None and s['rsi'] > 70
-    ]
-    oversold = [
-        {'symbol': s['symbol'], 'name': s['name'], 'rsi': s['rsi'], 'ytdReturn': s['ytdReturn']}
-        for s in summaries if s['rsi'] is not None and s['rsi'] < 30
-    ]
-    overbought.sort(key=lambda x: x['rsi'], reverse=True)
-    oversold.sort(key=lambda x: x['rsi'])
-    return overbought, oversold
+    return market_overview, overbought, oversold
 
 
 def main():
@@ -126,8 +145,7 @@ def main():
 
     rankings = build_rankings(summaries)
     sector_stats = build_sector_stats(summaries)
-    market_overview = build_market_overview(summaries, analysis_date)
-    overbought, oversold = find_extremes(summaries)
+    market_overview, overbought, oversold = build_overview_and_extremes(summaries, analysis_date)
 
     result = {
         'stocks': summaries,
@@ -138,8 +156,8 @@ def main():
         'oversold': oversold,
     }
 
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(result, f, indent=2)
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
 
     print(f"Wrote summary to {OUTPUT_FILE}")
     print(f"\n=== Market Overview ===")
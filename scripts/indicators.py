@@ -0,0 +1,108 @@
+"""
+Numba kernels for the technical indicators used by analyze.py.
+
+The functions are JIT-compiled on first use. Running build_indicators.py
+compiles them ahead of time into the indicators_aot extension module,
+which analyze.py prefers when it is importable and up to date.
+
+Re-run build_indicators.py after any change to this file. analyze.py
+detects a stale build by comparing this file's hash with the one recorded
+at build time, and falls back to the JIT kernels until it is rebuilt.
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def ewm_alpha(x, alpha):
+    """Exponentially weighted mean of x, matching pandas' ewm(alpha=..., adjust=False).mean()."""
+    n = x.shape[0]
+    out = np.empty(n)
+    decay = 1.0 - alpha
+    val = x[0]
+    out[0] = val
+    for i in range(1, n):
+        val = alpha * x[i] + decay * val
+        out[i] = val
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def ewm_pair(a, b, alpha, min_periods):
+    """Adjusted exponentially weighted means of two equal-length arrays.
+
+    Computes both recurrences in one loop; returns a (2, n) array.
+    """
+    n = a.shape[0]
+    out = np.empty((2, n))
+    decay = 1.0 - alpha
+    num_a = 0.0
+    num_b = 0.0
+    den = 0.0
+    for i in range(n):
+        num_a = a[i] + decay * num_a
+        num_b = b[i] + decay * num_b
+        den = 1.0 + decay * den
+        if i + 1 >= min_periods:
+            out[0, i] = num_a / den
+            out[1, i] = num_b / den
+        else:
+            out[0, i] = np.nan
+            out[1, i] = np.nan
+    return out
+
+
+@njit(cache=True)
+def rolling_means_and_bb(close, windows, bb_window):
+    """Rolling means for each window plus Bollinger mean/std, in one pass.
+
+    Returns an (n, len(windows) + 2) array: one column per moving average,
+    then the Bollinger mean and sample std. Leading rows without a full
+    window are NaN, as with pandas' rolling().
+    """
+    n = close.shape[0]
+    k = windows.shape[0]
+    out = np.full((n, k + 2), np.nan)
+    sums = np.zeros(k)
+    bb_mean = 0.0
+    bb_m2 = 0.0
+    bb_count = 0
+    for i in range(n):
+        x = close[i]
+        for j in range(k):
+            w = windows[j]
+            sums[j] += x
+            if i >= w:
+                sums[j] -= close[i - w]
+            if i >= w - 1:
+                out[i, j] = sums[j] / w
+
+        # Welford update for the Bollinger window: add incoming, drop outgoing
+        bb_count += 1
+        delta = x - bb_mean
+        bb_mean += delta / bb_count
+        bb_m2 += delta * (x - bb_mean)
+        if i >= bb_window:
+            old = close[i - bb_window]
+            bb_count -= 1
+            delta = old - bb_mean
+            bb_mean -= delta / bb_count
+            bb_m2 -= delta * (old - bb_mean)
+        if i >= bb_window - 1:
+            out[i, k] = bb_mean
+            out[i, k + 1] = np.sqrt(max(bb_m2, 0.0) / (bb_window - 1))
+    return out
+
+
+@njit(cache=True)
+def max_drawdown(close):
+    """Largest peak-to-trough decline of close, as a (non-positive) fraction."""
+    rmax = close[0]
+    dd_min = 0.0
+    for i in range(close.shape[0]):
+        if close[i] > rmax:
+            rmax = close[i]
+        dd = (close[i] - rmax) / rmax
+        if dd < dd_min:
+            dd_min = dd
+    return dd_min